@@ -1,9 +1,9 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
 from collections import Counter
 from metrics import coverage_at_q, deviation_from_uniform, uniform_divergence_score
 
+
 def generate_coverage_curve(probs):
     """
     Generate coverage-at-q curve data points.
@@ -14,31 +14,38 @@ def generate_coverage_curve(probs):
     Returns:
         tuple: (q_values, coverage_values)
     """
+    if not probs:
+        return [0.0, 1.0], [0.0, 0.0]
+
     # sort probabilities in the ascending order
     sorted_probs = sorted(probs.values())
+    n = len(sorted_probs)
+
+    # C̅(q) starts at 1 and drops by exactly 1/n at each sorted probability,
+    # so the steps can be read off the sorted order without evaluating C̅(q).
+    all_q_values = [0.0]
+    all_coverage_values = [1.0]
+    for i, p in enumerate(sorted_probs):
+        all_q_values += [p, p]
+        all_coverage_values += [(n - i) / n, (n - i - 1) / n]
+    all_q_values.append(1.0)
+    all_coverage_values.append(0.0)
 
-    # find points where coverage changes
-    q_values = [0.0] + sorted_probs + [1.0]
-    coverage_values = [coverage_at_q(probs, q) for q in q_values]
-
-    all_q_values = []
-    all_coverage_values = []
-    for i, q in enumerate(q_values):
-        cov = coverage_values[i]
-        all_q_values.append(q)
-        all_coverage_values.append(cov)
-        # Add a small step to create a step function effect
-        if q < 1.0:
-            all_q_values.append(q)
-            all_coverage_values.append(coverage_values[i + 1])
-    
     return all_q_values, all_coverage_values
 
 
-def plot_coverage_at_q(probs_extreme, probs_skewed, probs_skewed2, probs_skewed3, probs_uniform):
+def plot_coverage_at_q(probs_extreme, probs_skewed, probs_skewed2, probs_skewed3, probs_uniform, ax=None):
     """
     Create a visualization comparing coverage-at-q curves for different distributions.
+
+    If `ax` is given, it is cleared and reused instead of creating a new figure.
     """
+    # Imported here so that importing this module (e.g. for generate_coverage_curve)
+    # does not pay for loading matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
     # Generate curve data
     q_extreme, coverage_extreme = generate_coverage_curve(probs_extreme)
     q_skewed, coverage_skewed = generate_coverage_curve(probs_skewed)
@@ -46,53 +53,75 @@ def plot_coverage_at_q(probs_extreme, probs_skewed, probs_skewed2, probs_skewed3
     q_skewed3, coverage_skewed3 = generate_coverage_curve(probs_skewed3)
     q_uniform, coverage_uniform = generate_coverage_curve(probs_uniform)
     
-    # Create the plot
-    plt.figure(figsize=(7, 7))
-    
-    # Plot all curves
-    plt.plot(q_extreme, coverage_extreme, 'g-', linewidth=2, label='Extremely Skewed (100,0,0,0)', marker='o', markersize=3)
-    plt.plot(q_skewed, coverage_skewed, 'r-', linewidth=2, label='Highly Skewed (90,3,3,4)', marker='o', markersize=3)
-    plt.plot(q_skewed2, coverage_skewed2, 'orange', linewidth=2, label='Moderately Skewed (50,30,15,5)', marker='^', markersize=3)
-    plt.plot(q_skewed3, coverage_skewed3, 'purple', linewidth=2, label='Slightly Skewed (35,30,25,10)', marker='d', markersize=3)
-    plt.plot(q_uniform, coverage_uniform, 'b-', linewidth=2, label='Uniform (25,25,25,25)', marker='s', markersize=3)
-    
+    # Create the plot, or clear and reuse the caller's axes
+    created_figure = ax is None
+    if created_figure:
+        fig, ax = plt.subplots(figsize=(7, 7))
+    else:
+        ax.cla()
+        fig = ax.figure
+
+    # Plot all curves: one LineCollection for the lines, plus one scatter per marker style
+    curves = [
+        (q_extreme, coverage_extreme, 'g', 'o', 'Extremely Skewed (100,0,0,0)'),
+        (q_skewed, coverage_skewed, 'r', 'o', 'Highly Skewed (90,3,3,4)'),
+        (q_skewed2, coverage_skewed2, 'orange', '^', 'Moderately Skewed (50,30,15,5)'),
+        (q_skewed3, coverage_skewed3, 'purple', 'd', 'Slightly Skewed (35,30,25,10)'),
+        (q_uniform, coverage_uniform, 'b', 's', 'Uniform (25,25,25,25)'),
+    ]
+    ax.add_collection(LineCollection([np.column_stack([xs, ys]) for xs, ys, _, _, _ in curves],
+                                     colors=[color for _, _, color, _, _ in curves], linewidths=2))
+    for marker in dict.fromkeys(marker for _, _, _, marker, _ in curves):
+        group = [curve for curve in curves if curve[3] == marker]
+        ax.scatter(np.concatenate([xs for xs, _, _, _, _ in group]),
+                   np.concatenate([ys for _, ys, _, _, _ in group]),
+                   c=[color for xs, _, color, _, _ in group for _ in xs],
+                   marker=marker, s=3 ** 2, zorder=3)
+    # The collections carry no labels, so the legend is built from proxy lines
+    legend_handles = [Line2D([], [], color=color, linewidth=2, marker=marker, markersize=3, label=label)
+                      for _, _, color, marker, label in curves]
+
     # Customize the plot
-    plt.xlabel('Threshold q', fontsize=12)
-    plt.ylabel('Coverage C̅(q)', fontsize=12)
-    plt.title('Coverage C̅(q) Curves (100 items, 4 classes)', fontsize=12, fontweight='bold')
-    plt.grid(True, alpha=0.3)
-    plt.legend(fontsize=11)
-    
+    ax.set_xlabel('Threshold q', fontsize=12)
+    ax.set_ylabel('Coverage C̅(q)', fontsize=12)
+    ax.set_title('Coverage C̅(q) Curves (100 items, 4 classes)', fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.legend(handles=legend_handles, fontsize=11)
+
     # Set axis limits
-    plt.xlim(0, 1.0)
-    plt.ylim(0, 1.0)
-    
+    ax.set_xlim(0, 1.0)
+    ax.set_ylim(0, 1.0)
+
     # Add AUC-C@Q values as text
     dfu_extreme = 1.0-uniform_divergence_score(probs_extreme)
     dfu_skewed = 1.0-uniform_divergence_score(probs_skewed)
     dfu_skewed2 = 1.0-uniform_divergence_score(probs_skewed2)
     dfu_skewed3 = 1.0-uniform_divergence_score(probs_skewed3)
     dfu_uniform = 1.0-uniform_divergence_score(probs_uniform)
-    
-    plt.text(0.02, 0.98, f'Extremely Skewed UCS: {dfu_extreme:.3f}', transform=plt.gca().transAxes, 
-             verticalalignment='top', bbox=dict(boxstyle='round', facecolor='green', alpha=0.3))
-    plt.text(0.02, 0.90, f'Highly Skewed UCS: {dfu_skewed:.3f}', transform=plt.gca().transAxes, 
-             verticalalignment='top', bbox=dict(boxstyle='round', facecolor='red', alpha=0.3))
-    plt.text(0.02, 0.82, f'Moderately Skewed UCS: {dfu_skewed2:.3f}', transform=plt.gca().transAxes, 
-             verticalalignment='top', bbox=dict(boxstyle='round', facecolor='orange', alpha=0.3))
-    plt.text(0.02, 0.74, f'Slightly Skewed UCS: {dfu_skewed3:.3f}', transform=plt.gca().transAxes, 
-             verticalalignment='top', bbox=dict(boxstyle='round', facecolor='purple', alpha=0.3))
-    plt.text(0.02, 0.66, f'Uniform UCS: {dfu_uniform:.3f}', transform=plt.gca().transAxes, 
-             verticalalignment='top', bbox=dict(boxstyle='round', facecolor='blue', alpha=0.3))
-    
-    plt.gca().set_aspect('equal', adjustable='box')
-    plt.tight_layout()
-    plt.savefig('coverage_at_q.jpg', dpi=300, bbox_inches='tight')
-    plt.show()
-    plt.close()
 
+    ax.text(0.02, 0.98, f'Extremely Skewed UCS: {dfu_extreme:.3f}', transform=ax.transAxes, 
+            verticalalignment='top', bbox=dict(boxstyle='round', facecolor='green', alpha=0.3))
+    ax.text(0.02, 0.90, f'Highly Skewed UCS: {dfu_skewed:.3f}', transform=ax.transAxes, 
+            verticalalignment='top', bbox=dict(boxstyle='round', facecolor='red', alpha=0.3))
+    ax.text(0.02, 0.82, f'Moderately Skewed UCS: {dfu_skewed2:.3f}', transform=ax.transAxes, 
+            verticalalignment='top', bbox=dict(boxstyle='round', facecolor='orange', alpha=0.3))
+    ax.text(0.02, 0.74, f'Slightly Skewed UCS: {dfu_skewed3:.3f}', transform=ax.transAxes, 
+            verticalalignment='top', bbox=dict(boxstyle='round', facecolor='purple', alpha=0.3))
+    ax.text(0.02, 0.66, f'Uniform UCS: {dfu_uniform:.3f}', transform=ax.transAxes, 
+            verticalalignment='top', bbox=dict(boxstyle='round', facecolor='blue', alpha=0.3))
+
+    ax.set_aspect('equal', adjustable='box')
+    fig.tight_layout()
+    fig.savefig('coverage_at_q.jpg', dpi=300)
+    if created_figure:
+        plt.close(fig)
+
+
+def main():
+    """Print the metrics of the example distributions and save coverage_at_q.jpg."""
+    import matplotlib
+    matplotlib.use('Agg')  # headless: the script only saves its figure
 
-if __name__ == "__main__":
     # Example Usage:
     # Different types of skewed distributions (100 items, 4 classes)
     counts_extreme = Counter({'a': 100, 'b': 0, 'c': 0, 'd': 0})      # Highly skewed
@@ -141,3 +170,7 @@ if __name__ == "__main__":
     # Create visualization
     print("Generating Coverage-at-Q visualization...")
     plot_coverage_at_q(probs_extreme, probs_skewed, probs_skewed2, probs_skewed3, probs_uniform)
+
+
+if __name__ == "__main__":
+    main()
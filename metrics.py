@@ -1,32 +1,106 @@
+from __future__ import annotations
+
 import math
 from collections import Counter
 
+import numpy as np
+
+
+class PreparedCounts:
+    """
+    Category counts materialized once as a sorted array, so that the same
+    distribution can be fed to several metrics/curves without re-reading the Counter.
+
+    Attributes:
+        vals: Array of the counts, sorted in ascending order (float64 if any count
+            is fractional, so results match the Counter exactly)
+        total: Total number of items (sum of the counts)
+        n: Number of categories in the input Counter
+    """
+
+    def __init__(self, counts: Counter):
+        self.vals = np.sort(np.asarray(list(counts.values())))
+        self.total = self.vals.sum().item()
+        self.n = int(self.vals.size)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def count_above(self, k):
+        """
+        Number of categories with a count strictly greater than k.
+
+        Because `vals` is sorted this is a binary search, O(log n) per threshold;
+        `k` may be a scalar or an array of thresholds.
+        """
+        return self.n - np.searchsorted(self.vals, k, side='right')
+
+
 # Using the corrected, simpler version of this function
-def coverage_at_k(counts: Counter, k: float, total_possible: int) -> float:
+def coverage_at_k(counts: Counter | PreparedCounts, k: float, total_possible: int) -> float:
     """
     Calculates the proportion of possible categories with a count strictly greater than k.
     """
     if total_possible == 0:
         return 0.0
-    count_greater_than_k = sum(1 for v in counts.values() if v > k)
+    if isinstance(counts, PreparedCounts):
+        count_greater_than_k = int(counts.count_above(k))
+    else:
+        count_greater_than_k = len([v for v in counts.values() if v > k])
     return count_greater_than_k / total_possible
 
 
-def auc_catk(counts: Counter, total_possible: int) -> float:
+def coverage_curve(counts: Counter | PreparedCounts, ks, total_possible: int) -> np.ndarray:
+    """
+    Evaluates coverage_at_k at every threshold in `ks`, using one sort of the counts
+    and a binary search per threshold.
+
+    Args:
+        counts: Counter object with category counts, or a PreparedCounts
+        ks: Sequence of count thresholds
+        total_possible: Total number of possible categories
+
+    Returns:
+        np.ndarray: C(k) for each k in `ks`
+    """
+    ks_arr = np.asarray(ks)
+    if total_possible == 0:
+        return np.zeros(ks_arr.shape, dtype=float)
+    if not isinstance(counts, PreparedCounts):
+        counts = PreparedCounts(counts)
+    return counts.count_above(ks_arr) / total_possible
+
+
+def auc_catk(counts: Counter | PreparedCounts | np.ndarray, total_possible: int) -> float:
     """
     Calculates the standard normalized AUC-C(K) up to the Even Point.
 
     Args:
-        counts: Counter object with category counts
+        counts: Counter object with category counts, a PreparedCounts,
+            or a 1-D integer array with one count per category
         total_possible: Total number of possible categories
 
     Returns:
         float: Normalized AUC-C(K) up to the Even Point
     """
-    if total_possible == 0 or not counts:
+    if isinstance(counts, np.ndarray) and counts.ndim != 1:
+        raise ValueError(f"counts array must be 1-D, got shape {counts.shape}")
+
+    if total_possible == 0 or len(counts) == 0:
         return 0.0
 
-    total_items = sum(counts.values())
+    if isinstance(counts, np.ndarray):
+        # Plain count vector (e.g. a row of a multinomial draw); no dict needed.
+        vals = counts
+    elif isinstance(counts, PreparedCounts):
+        vals = counts.vals
+    else:
+        vals = None
+
+    if vals is not None:
+        total_items = vals.sum().item()
+    else:
+        total_items = sum(counts.values())
 
     # BUG FIX 1: Use total_possible to calculate the even point.
     if total_possible == 0: # Avoid division by zero
@@ -37,12 +111,62 @@ def auc_catk(counts: Counter, total_possible: int) -> float:
     if even_point <= 0:
         return 0.0
 
-    observed_area = sum(coverage_at_k(counts, k, total_possible) for k in range(even_point))
+    # sum_{k=0}^{even_point-1} C(k) in closed form: a category with count v is
+    # above the threshold for exactly min(ceil(v), even_point) of those k values
+    # (ceil only matters for non-integer counts).
+    if vals is not None:
+        if vals.dtype.kind == 'f':
+            vals = np.ceil(vals)
+        observed_area = np.clip(vals, 0, even_point).sum().item() / total_possible
+    else:
+        observed_area = sum(min(max(math.ceil(v), 0), even_point) for v in counts.values()) / total_possible
 
     # BUG FIX 2: The ideal area for the standard definition is just even_point.
     # The final value is the observed area divided by the ideal area.
     return observed_area / even_point
 
+def auc_catk_batch(counts_list, total_possible: int) -> np.ndarray:
+    """
+    Calculates auc_catk for many distributions in one vectorized pass.
+
+    Args:
+        counts_list: Sequence of Counter objects (or PreparedCounts) with category counts,
+            or an array of shape (num_distributions, C) with one count vector per row
+        total_possible: Total number of possible categories, shared by all distributions
+
+    Returns:
+        np.ndarray: Normalized AUC-C(K) of each distribution, in input order
+    """
+    num_dists = len(counts_list)
+    if total_possible == 0 or num_dists == 0:
+        return np.zeros(num_dists, dtype=float)
+
+    if isinstance(counts_list, np.ndarray):
+        if counts_list.ndim != 2:
+            raise ValueError(f"counts array must be 2-D, got shape {counts_list.shape}")
+        V = counts_list
+    else:
+        # Pad every distribution with zero counts to a common width; a zero count
+        # adds nothing to either the total or the clipped area below.
+        rows = [counts.vals if isinstance(counts, PreparedCounts) else np.asarray(list(counts.values()))
+                for counts in counts_list]
+        width = max(len(vals) for vals in rows)
+        # int64 unless some distribution has fractional counts
+        V = np.zeros((num_dists, width), dtype=np.result_type(np.int64, *rows))
+        for i, vals in enumerate(rows):
+            V[i, :len(vals)] = vals
+
+    even_points = np.floor(V.sum(axis=1) / total_possible)
+    # Same closed form as auc_catk: each count contributes min(ceil(v), even_point).
+    if V.dtype.kind == 'f':
+        V = np.ceil(V)
+    observed_scaled = np.clip(V, 0, even_points[:, None]).sum(axis=1)
+
+    aucs = np.zeros(num_dists, dtype=float)
+    valid = even_points > 0
+    aucs[valid] = observed_scaled[valid] / (even_points[valid] * total_possible)
+    return aucs
+
 def coverage_at_q(probs: dict, q: float) -> float:
     """
     Calculates the proportion of categories with a probability greater than or equal to q.
@@ -61,9 +185,29 @@ def coverage_at_q(probs: dict, q: float) -> float:
     
     assert 0.0 <= q <= 1.0, "q must be in [0, 1]"
 
-    count_greater_equal_q = sum(1 for v in probs.values() if v > q)
+    count_greater_equal_q = len([v for v in probs.values() if v > q])
     return count_greater_equal_q / len(probs)
 
+def coverage_curve_q(probs: dict, qs) -> np.ndarray:
+    """
+    Evaluates coverage_at_q at every threshold in `qs` in one vectorized pass.
+
+    Args:
+        probs: Dictionary with category probabilities
+        qs: Sequence of probability thresholds
+
+    Returns:
+        np.ndarray: C̅(q) for each q in `qs`
+    """
+    qs_arr = np.asarray(qs, dtype=np.float64)
+    if not probs:
+        return np.zeros(qs_arr.shape, dtype=float)
+
+    assert np.all((0.0 <= qs_arr) & (qs_arr <= 1.0)), "q must be in [0, 1]"
+
+    vals = np.fromiter(probs.values(), dtype=np.float64, count=len(probs))
+    return np.count_nonzero(vals[None, :] > qs_arr[:, None], axis=1) / len(probs)
+
 def deviation_from_uniform(probs: dict) -> float:
     """
     Calculates the deviation from the uniform distribution using the coverage-at-q metric C̅(q).
@@ -86,32 +230,41 @@ def deviation_from_uniform(probs: dict) -> float:
 
     p_uniform = 1.0 / num_categories
 
-    # It's crucial that p_uniform is included to correctly split the integral.
-    breakpoints = sorted(list(set([0.0, 1.0, p_uniform] + list(probs.values()))))
+    # C̅(q) = (1/C) * sum_c 1[p_c > q], so each category contributes
+    # min(p_c, p_uniform) to ∫_{0}^{p_uniform} C̅(q) dq and
+    # max(p_c - p_uniform, 0) to ∫_{p_uniform}^{1} C̅(q) dq.
+    # This gives both integrals in one pass, without enumerating breakpoints.
+    area_below = sum(min(v, p_uniform) for v in probs.values()) / num_categories
+    area_above = sum(v - p_uniform for v in probs.values() if v > p_uniform) / num_categories
 
-    raw_area = 0.0
-    
-    for i in range(1, len(breakpoints)):
-        q_start = breakpoints[i-1]
-        q_end = breakpoints[i]
-        width = q_end - q_start
-
-        if width == 0:
-            continue
-
-        # The value of C̅(q) is constant over the interval [q_start, q_end).
-        # We must evaluate its value at the beginning of the interval.
-        coverage = coverage_at_q(probs, q_start) # <-- THE FIX
-
-        # Apply the correct rule based on which side of p_uniform the interval lies.
-        # Note: We check the interval midpoint to handle cases where a breakpoint is exactly p_uniform
-        interval_midpoint = q_start + width / 2
-        if interval_midpoint < p_uniform:
-            # This interval is in the first part of the integral: ∫(1 - C̅(q)) dq
-            raw_area += (1 - coverage) * width
-        else:
-            # This interval is in the second part of the integral: ∫C̅(q) dq
-            raw_area += coverage * width
+    # ∫(1 - C̅(q)) dq below p_uniform plus ∫C̅(q) dq above it.
+    raw_area = (p_uniform - area_below) + area_above
+
+    normalization_factor = (num_categories**2) / (2 * (num_categories - 1))
+
+    return normalization_factor * raw_area
+
+def deviation_from_uniform_batch(P: np.ndarray) -> np.ndarray:
+    """
+    Calculates deviation_from_uniform for every row of a probability matrix at once.
+
+    Args:
+        P: Array of shape (num_distributions, C); each row is one distribution
+
+    Returns:
+        np.ndarray: UDS of each row
+    """
+    P = np.asarray(P, dtype=np.float64)
+    num_dists, num_categories = P.shape
+    if num_categories <= 1:
+        return np.zeros(num_dists, dtype=float)
+
+    p_uniform = 1.0 / num_categories
+
+    # Same per-category decomposition of the two integrals as deviation_from_uniform
+    area_below = np.minimum(P, p_uniform).sum(axis=1) / num_categories
+    area_above = np.maximum(P - p_uniform, 0.0).sum(axis=1) / num_categories
+    raw_area = (p_uniform - area_below) + area_above
 
     normalization_factor = (num_categories**2) / (2 * (num_categories - 1))
 
@@ -120,4 +273,8 @@ def deviation_from_uniform(probs: dict) -> float:
 # Alias for new terminology (Uniform Divergence Score / UDS)
 def uniform_divergence_score(probs: dict) -> float:
     """Alias of deviation_from_uniform for UDS naming consistency."""
-    return deviation_from_uniform(probs)
\ No newline at end of file
+    return deviation_from_uniform(probs)
+
+def uniform_divergence_score_batch(P: np.ndarray) -> np.ndarray:
+    """Alias of deviation_from_uniform_batch for UDS naming consistency."""
+    return deviation_from_uniform_batch(P)
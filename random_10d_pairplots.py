@@ -3,16 +3,16 @@ Randomly sample many 10-D categorical distributions, compute metrics, and
 draw Nature-quality pairwise scatter plots.
 
 Metrics
-- AUC-C(K): computed from counts drawn via a Multinomial(N, p), using auc_catk
+- AUC-C(K): computed from counts drawn via a Multinomial(N, p), using auc_catk_batch
 - UCS: 1 - deviation_from_uniform (alias uniform_divergence_score in metrics)
 - Shannon entropy (normalized): H(p) / log(C), C=10
 
 Outputs
 - pairwise_scatter_10d.png (600 dpi)
-- pairwise_scatter_10d.pdf (vector)
+- pairwise_scatter_10d.pdf (vector; only with --pdf)
 
 Usage
-  python random_10d_pairplots.py --samples 5000 --N 100 --seed 42
+  python random_10d_pairplots.py --samples 5000 --N 100 --seed 42 [--pdf]
 
 Notes
 - Distributions p are sampled from a Dirichlet with concentration c · 1_C,
@@ -24,15 +24,13 @@ from __future__ import annotations
 
 import argparse
 import math
-from collections import Counter
 from dataclasses import dataclass
-from typing import Tuple
 
 import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
-from metrics import auc_catk, uniform_divergence_score
+from metrics import auc_catk_batch, uniform_divergence_score_batch
 
 
 # -----------------------------
@@ -55,6 +53,18 @@ mpl.rcParams.update({
     "font.family": "DejaVu Sans",  # Robust default; swap to 'Arial' if available
 })
 
+# Above this many points per panel, rasterized scatter layers save faster and
+# produce smaller PDFs than per-point vector paths; below it, vector is smaller.
+RASTERIZE_MIN_POINTS = 50_000
+
+# Below this Dirichlet concentration, Gamma draws are made in log space rather than
+# directly (the same cutoff below which NumPy's dirichlet changes method).
+SMALL_ALPHA = 0.1
+
+# Samples are generated and scored this many at a time, so peak memory is bounded
+# by one block of P / counts rather than by --samples.
+BLOCK_SIZE = 100_000
+
 
 @dataclass
 class Config:
@@ -65,69 +75,84 @@ class Config:
     alpha_min: float = 0.05
     alpha_max: float = 20.0
     show: bool = False
+    pdf: bool = False
 
 
-def sample_dirichlet_variety(cfg: Config) -> np.ndarray:
+def sample_concentrations(cfg: Config, rng: np.random.Generator) -> np.ndarray:
     """
-    Sample `cfg.samples` probability vectors of dimension `cfg.categories` from a
-    Dirichlet with random concentration c * 1_C, where c ~ LogUniform(alpha_min, alpha_max).
-    Returns: array of shape (samples, C)
+    Draw one Dirichlet concentration per sample, c ~ LogUniform(alpha_min, alpha_max).
+    Returns: array of shape (samples,)
     """
-    rng = np.random.default_rng(cfg.seed)
     # Draw log-uniform by sampling u ~ U(log(a), log(b)), then c = exp(u)
     log_a, log_b = math.log(cfg.alpha_min), math.log(cfg.alpha_max)
     u = rng.uniform(log_a, log_b, size=cfg.samples)
-    c = np.exp(u)
-
-    C = cfg.categories
-    P = np.empty((cfg.samples, C), dtype=float)
-    for i in range(cfg.samples):
-        alpha = np.full(C, c[i], dtype=float)
-        P[i] = rng.dirichlet(alpha)
-    return P
+    return np.exp(u)
 
 
-def compute_metrics_for_probs(p: np.ndarray, cfg: Config) -> Tuple[float, float, float]:
+def sample_dirichlet_variety(c: np.ndarray, C: int, rng: np.random.Generator) -> np.ndarray:
     """
-    Compute (auc_c, ucs, h_norm) for one probability vector p.
-    - auc_c: using counts ~ Multinomial(N, p)
-    - ucs: 1 - uniform_divergence_score(p)
-    - h_norm: normalized Shannon entropy H(p)/log(C)
+    Sample one probability vector of dimension C per concentration in `c`, from a
+    Dirichlet with concentration c * 1_C.
+    Returns: array of shape (len(c), C)
     """
-    C = p.shape[0]
-    # AUC-C(K): build counts from Multinomial
-    counts = np.random.default_rng().multinomial(cfg.N, p)
-    counter = Counter({i: int(counts[i]) for i in range(C)})
-    auc_c = auc_catk(counter, total_possible=C)
+    # Dirichlet(c * 1_C) == independent Gamma(c) draws normalized to sum to 1,
+    # so most samples come from a single vectorized Gamma call. The (samples, 1)
+    # concentrations broadcast against `size`; no alpha matrix is built.
+    # For small c, Gamma(c) underflows to exactly 0, sometimes for a whole row, which
+    # would normalize to NaN. Those rows use X * U^(1/c) ~ Gamma(c) with X ~ Gamma(c+1)
+    # and U ~ U(0,1], taken in log space and normalized with a row-wise log-sum-exp.
+    small = c < SMALL_ALPHA
+    P = np.empty((len(c), C), dtype=np.float64)
+    G = rng.standard_gamma(c[~small, None], size=(np.count_nonzero(~small), C), dtype=np.float64)
+    P[~small] = G / G.sum(axis=1, keepdims=True)
+
+    c_s = c[small, None]
+    shape = (len(c_s), C)
+    log_G = np.log(rng.standard_gamma(c_s + 1.0, size=shape)) + np.log1p(-rng.random(shape)) / c_s
+    log_G -= log_G.max(axis=1, keepdims=True)
+    G = np.exp(log_G)
+    P[small] = G / G.sum(axis=1, keepdims=True)
+    return P
 
-    # UCS: metrics.uniform_divergence_score returns deviation-from-uniform
-    prob_dict = {i: float(pi) for i, pi in enumerate(p)}
-    ucs = 1.0 - uniform_divergence_score(prob_dict)
-
-    # Shannon entropy (normalized)
-    eps = 1e-12
-    h = -float(np.sum(p * np.log(p + eps)))
-    h_norm = h / math.log(C)
-    return auc_c, ucs, h_norm
 
+def pairwise_scatter(auc: np.ndarray, ucs: np.ndarray, h: np.ndarray, cfg: Config, axes=None) -> np.ndarray:
+    """
+    Create and save pairwise scatter plots with consistent [0,1] axes.
 
-def pairwise_scatter(auc: np.ndarray, ucs: np.ndarray, h: np.ndarray, cfg: Config) -> None:
-    """Create and save pairwise scatter plots with consistent [0,1] axes."""
-    # Correlations (Pearson)
-    def corr(x, y):
-        if len(x) < 2:
-            return float("nan")
-        return float(np.corrcoef(x, y)[0, 1])
+    Args:
+        auc, ucs, h: Per-sample metric values
+        cfg: Run configuration (output/show flags)
+        axes: Axes returned by a previous call; if given, their points and r labels
+            are updated in place instead of building and laying out a new figure
 
-    r_auc_ucs = corr(auc, ucs)
-    r_auc_h = corr(auc, h)
-    r_ucs_h = corr(ucs, h)
+    Returns:
+        np.ndarray: The three panel axes, for reuse on the next call
+    """
+    # Correlations (Pearson), all three pairs from one correlation matrix
+    if len(auc) < 2:
+        r_auc_ucs = r_auc_h = r_ucs_h = float("nan")
+    else:
+        R = np.corrcoef(np.stack((auc, ucs, h)))
+        r_auc_ucs, r_auc_h, r_ucs_h = float(R[0, 1]), float(R[0, 2]), float(R[1, 2])
+
+    # For large sample counts, rasterize the points (at savefig.dpi) so the PDF does
+    # not carry one vector path per sample; axes, labels and text stay vector.
+    rasterize = len(auc) >= RASTERIZE_MIN_POINTS
+
+    if axes is not None:
+        fig = axes[0].figure
+        for ax, x, y, r in zip(axes, (auc, auc, ucs), (ucs, h, h), (r_auc_ucs, r_auc_h, r_ucs_h)):
+            ax.collections[0].set_offsets(np.column_stack((x, y)))
+            ax.collections[0].set_rasterized(rasterize)
+            ax.texts[0].set_text(f"r = {r:.2f}")
+        _save_pairwise_figure(fig, cfg)
+        return axes
 
     # Figure size: Nature double-column width ~180 mm = 7.09 in
     # Use 7.2 x 2.6 inches for a clean 1x3 layout
     fig, axes = plt.subplots(1, 3, figsize=(7.2, 2.6), constrained_layout=True)
 
-    points_kw = dict(s=6, alpha=0.35, edgecolor="none")
+    points_kw = dict(s=6, alpha=0.35, edgecolor="none", rasterized=rasterize)
 
     # AUC vs UCS
     ax = axes[0]
@@ -159,41 +184,60 @@ def pairwise_scatter(auc: np.ndarray, ucs: np.ndarray, h: np.ndarray, cfg: Confi
     ax.grid(True, alpha=0.3)
     ax.text(0.02, 0.98, f"r = {r_ucs_h:.2f}", transform=ax.transAxes, va="top")
 
-    # Save high-quality outputs
+    _save_pairwise_figure(fig, cfg)
+    if not cfg.show:
+        # Detached from pyplot, but the figure can still be updated and saved
+        plt.close(fig)
+    return axes
+
+
+def _save_pairwise_figure(fig, cfg: Config) -> None:
+    """Save high-quality outputs (and show the figure if requested)."""
     fig.savefig("pairwise_scatter_10d.png", bbox_inches="tight")
-    fig.savefig("pairwise_scatter_10d.pdf", bbox_inches="tight")
-    if cfg.show:
+    if cfg.pdf:
+        # No CreationDate, so regenerating an unchanged figure gives an identical file
+        fig.savefig("pairwise_scatter_10d.pdf", bbox_inches="tight", metadata={"CreationDate": None})
+    # Once its window has been closed pyplot no longer tracks the figure, and there
+    # is nothing left to show
+    if cfg.show and plt.fignum_exists(fig.number):
         plt.show()
-    plt.close(fig)
 
 
 def main(cfg: Config) -> None:
-    P = sample_dirichlet_variety(cfg)
-
-    # Compute metrics
-    auc_list = np.empty(cfg.samples, dtype=float)
-    ucs_list = np.empty(cfg.samples, dtype=float)
-    h_list = np.empty(cfg.samples, dtype=float)
+    if not cfg.show:
+        # Nothing is displayed, so skip GUI toolkit initialization
+        plt.switch_backend("Agg")
 
     rng = np.random.default_rng(cfg.seed)
-    # Use local RNG for multinomial draws inside compute_metrics to be reproducible
-    # by temporarily seeding numpy's default RNG per iteration is heavy; instead,
-    # draw counts here and pass them? Keep simple and accept minor randomness.
-    np.random.seed(cfg.seed)
+    c = sample_concentrations(cfg, rng)
+
+    # Metrics go into one (samples, 3) buffer; auc_list / ucs_list / h_list are
+    # column views of it. Everything else only lives for one block.
+    scores = np.empty((cfg.samples, 3), dtype=np.float64)
+    auc_list, ucs_list, h_list = scores[:, 0], scores[:, 1], scores[:, 2]
+
+    eps = 1e-12
+    for start in range(0, cfg.samples, BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, cfg.samples)
+        P = sample_dirichlet_variety(c[start:end], cfg.categories, rng)
+        # One Multinomial(N, p) draw per row of P, in a single call
+        counts = rng.multinomial(cfg.N, P)
+
+        auc_list[start:end] = auc_catk_batch(counts, total_possible=cfg.categories)
+
+        # UCS: metrics.uniform_divergence_score_batch returns deviation-from-uniform per row
+        ucs_list[start:end] = 1.0 - uniform_divergence_score_batch(P)
 
-    for i in range(cfg.samples):
-        auc, ucs, h = compute_metrics_for_probs(P[i], cfg)
-        auc_list[i] = auc
-        ucs_list[i] = ucs
-        h_list[i] = h
+        # Shannon entropy normalized by log(C)
+        h_list[start:end] = -np.sum(P * np.log(P + eps), axis=1) / math.log(cfg.categories)
 
     print(f"Samples: {cfg.samples}, N per sample: {cfg.N}, C: {cfg.categories}")
-    print(f"AUC-C  mean={auc_list.mean():.3f}  std={auc_list.std(ddof=1):.3f}")
-    print(f"UCS    mean={ucs_list.mean():.3f}  std={ucs_list.std(ddof=1):.3f}")
-    print(f"H_norm mean={h_list.mean():.3f}  std={h_list.std(ddof=1):.3f}")
+    means, stds = scores.mean(axis=0), scores.std(axis=0, ddof=1)
+    for name, mean, std in zip(("AUC-C ", "UCS   ", "H_norm"), means, stds):
+        print(f"{name} mean={mean:.3f}  std={std:.3f}")
 
     pairwise_scatter(auc_list, ucs_list, h_list, cfg)
-    print("Saved: pairwise_scatter_10d.png, pairwise_scatter_10d.pdf")
+    print("Saved: pairwise_scatter_10d.png" + (", pairwise_scatter_10d.pdf" if cfg.pdf else ""))
 
 
 def parse_args() -> Config:
@@ -204,6 +248,7 @@ def parse_args() -> Config:
     ap.add_argument("--alpha-min", type=float, default=0.05, help="Min concentration for log-uniform c")
     ap.add_argument("--alpha-max", type=float, default=20.0, help="Max concentration for log-uniform c")
     ap.add_argument("--show", action="store_true", help="Show the figure interactively")
+    ap.add_argument("--pdf", action="store_true", help="Also save a vector PDF of the figure")
     args = ap.parse_args()
     return Config(
         samples=args.samples,
@@ -213,6 +258,7 @@ def parse_args() -> Config:
         alpha_min=args.alpha_min,
         alpha_max=args.alpha_max,
         show=args.show,
+        pdf=args.pdf,
     )
 
 
@@ -0,0 +1,149 @@
+"""
+Checks the closed-form metrics in metrics.py against the original loop-based
+definitions on small random inputs.
+
+Usage
+  python -m pytest -q test_metrics.py
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from metrics import (
+    PreparedCounts,
+    auc_catk,
+    auc_catk_batch,
+    coverage_at_k,
+    coverage_at_q,
+    coverage_curve,
+    coverage_curve_q,
+    deviation_from_uniform,
+    deviation_from_uniform_batch,
+)
+
+
+def naive_auc_catk(counts: Counter, total_possible: int) -> float:
+    """Sums C(k) over k = 0 ... even_point - 1, one threshold at a time."""
+    if total_possible == 0 or not counts:
+        return 0.0
+    even_point = math.floor(sum(counts.values()) / total_possible)
+    if even_point <= 0:
+        return 0.0
+    observed_area = sum(coverage_at_k(counts, k, total_possible) for k in range(even_point))
+    return observed_area / even_point
+
+
+def naive_coverage_at_k(counts: Counter, k: float, total_possible: int) -> float:
+    """Counts categories with v > k one by one."""
+    if total_possible == 0:
+        return 0.0
+    return sum(1 for v in counts.values() if v > k) / total_possible
+
+
+def naive_deviation_from_uniform(probs: dict) -> float:
+    """Integrates the C̅(q) step function interval by interval between its breakpoints."""
+    num_categories = len(probs)
+    if num_categories <= 1:
+        return 0.0
+    p_uniform = 1.0 / num_categories
+    breakpoints = sorted(set([0.0, 1.0, p_uniform] + list(probs.values())))
+
+    raw_area = 0.0
+    for q_start, q_end in zip(breakpoints[:-1], breakpoints[1:]):
+        width = q_end - q_start
+        coverage = sum(1 for v in probs.values() if v > q_start) / num_categories
+        if q_start + width / 2 < p_uniform:
+            raw_area += (1 - coverage) * width
+        else:
+            raw_area += coverage * width
+    return (num_categories**2) / (2 * (num_categories - 1)) * raw_area
+
+
+def random_counters(rng, num, fractional=False):
+    counters = []
+    for _ in range(num):
+        vals = rng.integers(0, 40, size=rng.integers(1, 9))
+        if fractional:
+            vals = vals + rng.random(vals.size)
+        counters.append(Counter({i: v.item() for i, v in enumerate(vals)}))
+    return counters
+
+
+@pytest.mark.parametrize("fractional", [False, True])
+@pytest.mark.parametrize("total_possible", [1, 4, 10])
+def test_auc_catk_matches_naive(fractional, total_possible):
+    rng = np.random.default_rng(0)
+    for counts in random_counters(rng, 200, fractional):
+        expected = naive_auc_catk(counts, total_possible)
+        assert auc_catk(counts, total_possible) == pytest.approx(expected)
+        assert auc_catk(PreparedCounts(counts), total_possible) == pytest.approx(expected)
+        assert auc_catk(np.array(list(counts.values())), total_possible) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("fractional", [False, True])
+def test_auc_catk_batch_matches_naive(fractional):
+    rng = np.random.default_rng(1)
+    counters = random_counters(rng, 200, fractional)
+    expected = [naive_auc_catk(counts, 6) for counts in counters]
+    assert auc_catk_batch(counters, 6) == pytest.approx(expected)
+    assert auc_catk_batch([PreparedCounts(c) for c in counters], 6) == pytest.approx(expected)
+
+    V = rng.multinomial(50, np.full(6, 1 / 6), size=100)
+    expected = [naive_auc_catk(Counter(dict(enumerate(row.tolist()))), 6) for row in V]
+    assert auc_catk_batch(V, 6) == pytest.approx(expected)
+
+
+def test_auc_catk_edge_cases():
+    assert auc_catk(Counter(), 4) == 0.0
+    assert auc_catk(Counter({'a': 3}), 0) == 0.0
+    assert auc_catk(Counter({'a': 1, 'b': 1}), 4) == 0.0  # even point is 0
+    assert auc_catk(Counter({'a': 90, 'b': 3, 'c': 3, 'd': 4}), 4) == pytest.approx(0.35)
+    with pytest.raises(ValueError):
+        auc_catk(np.ones((2, 3), dtype=np.int64), 3)
+    with pytest.raises(ValueError):
+        auc_catk_batch(np.ones(3, dtype=np.int64), 3)
+
+
+@pytest.mark.parametrize("fractional", [False, True])
+@pytest.mark.parametrize("total_possible", [0, 3, 10])
+def test_coverage_curve_matches_naive(fractional, total_possible):
+    rng = np.random.default_rng(3)
+    for counts in random_counters(rng, 100, fractional):
+        # Float thresholds, plus every count value itself to hit the ties exactly
+        ks = np.concatenate([rng.uniform(-1, 45, size=20), list(counts.values()), [0, 0.5]])
+        expected = [naive_coverage_at_k(counts, k, total_possible) for k in ks]
+        prepared = PreparedCounts(counts)
+        assert coverage_curve(counts, ks, total_possible) == pytest.approx(expected)
+        assert coverage_curve(prepared, ks, total_possible) == pytest.approx(expected)
+        assert [coverage_at_k(prepared, k, total_possible) for k in ks] == pytest.approx(expected)
+        assert [coverage_at_k(counts, k, total_possible) for k in ks] == pytest.approx(expected)
+
+
+def test_coverage_curve_q_matches_coverage_at_q():
+    rng = np.random.default_rng(4)
+    P = rng.dirichlet(np.full(5, 0.5), size=50)
+    P[0] = 1 / 5
+    for p in P:
+        probs = dict(enumerate(p.tolist()))
+        # Thresholds equal to the probabilities check the strict > at the steps
+        qs = np.concatenate([np.linspace(0, 1, 21), p])
+        expected = [coverage_at_q(probs, q) for q in qs]
+        assert coverage_curve_q(probs, qs) == pytest.approx(expected)
+    assert coverage_curve_q({}, [0.0, 0.5]) == pytest.approx([0.0, 0.0])
+
+
+def test_deviation_from_uniform_matches_naive():
+    rng = np.random.default_rng(2)
+    P = rng.dirichlet(np.full(7, 0.5), size=200)
+    # Exact ties with 1/C and exact zeros exercise the breakpoint handling
+    P[0] = 1 / 7
+    P[1] = np.eye(7)[3]
+    expected = [naive_deviation_from_uniform(dict(enumerate(p.tolist()))) for p in P]
+
+    for p, exp in zip(P, expected):
+        assert deviation_from_uniform(dict(enumerate(p.tolist()))) == pytest.approx(exp, abs=1e-12)
+    assert deviation_from_uniform_batch(P) == pytest.approx(expected, abs=1e-12)
+    assert deviation_from_uniform_batch(P[:, :1]) == pytest.approx(np.zeros(200))
@@ -0,0 +1,19 @@
+"""Checks for the sampling helpers in random_10d_pairplots.py."""
+
+import numpy as np
+
+from random_10d_pairplots import sample_dirichlet_variety
+
+
+def test_sample_dirichlet_variety_small_alpha():
+    # Gamma(c) underflows to 0 for tiny c; every row must still be a valid distribution
+    rng = np.random.default_rng(0)
+    c = np.concatenate([np.full(500, 5e-4), np.full(500, 0.05), np.full(500, 5.0)])
+    P = sample_dirichlet_variety(c, 10, rng)
+
+    assert P.shape == (1500, 10)
+    assert np.isfinite(P).all()
+    assert (P >= 0).all()
+    assert np.allclose(P.sum(axis=1), 1.0)
+    counts = rng.multinomial(100, P)
+    assert (counts.sum(axis=1) == 100).all()